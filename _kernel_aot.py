@@ -0,0 +1,77 @@
+"""Kompilasi AOT kernel skoring Jiwa menjadi modul ekstensi `jiwa_kernel`.
+
+Jalankan sekali saat instalasi/build:
+
+    python _kernel_aot.py
+
+Hasilnya (`jiwa_kernel*.so`) hanya membutuhkan numpy saat runtime, tanpa numba dan
+tanpa warm-up JIT. `jiwa_relapse_predictor` memuatnya otomatis bila tersedia.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from numba import carray, cfunc, types
+from numba.pycc import CC
+
+from jiwa_relapse_predictor import KERNEL_VERSION, FEATURE_NAMES, SNAPSHOT_FIELDS, _kernel_into
+
+N_FIELDS = len(SNAPSHOT_FIELDS)
+N_FEATURES = len(FEATURE_NAMES)
+
+cc = CC("jiwa_kernel")
+
+
+@cc.export("kernel_version", "i8()")
+def kernel_version():
+    """Versi `_kernel_into` saat modul ini dikompilasi; dicek saat import."""
+    return KERNEL_VERSION
+
+
+# `_kernel_into` membaca s[0..17] dan w[0..9] tanpa bounds check, jadi bentuk input
+# divalidasi di setiap titik masuk yang diekspor.
+@cc.export("score", "f8[:](f8[:], f8[:])")
+def score(snap, w):
+    """`[risk, f0..f9]` untuk satu snapshot 18 field dan 10 bobot."""
+    if snap.shape[0] != N_FIELDS:
+        raise ValueError("snap harus berisi 18 field")
+    if w.shape[0] != N_FEATURES:
+        raise ValueError("w harus berisi 10 bobot")
+    out = np.empty(N_FEATURES + 1, dtype=np.float64)
+    out[0] = _kernel_into(snap, w, out[1:])
+    return out
+
+
+@cc.export("score_matrix", "f8[:,:](f8[:,:], f8[:])")
+@cc.export("score_matrix_f4", "f4[:,:](f4[:,:], f4[:])")
+def score_matrix(snaps, w):
+    """Baris ke-i berisi `[risk, f0..f9]` untuk snapshot `snaps[i]` (matriks (N, 18))."""
+    if snaps.shape[1] != N_FIELDS:
+        raise ValueError("snaps harus bermatriks (N, 18)")
+    if w.shape[0] != N_FEATURES:
+        raise ValueError("w harus berisi 10 bobot")
+    out = np.empty((snaps.shape[0], N_FEATURES + 1), dtype=snaps.dtype)
+    for i in range(snaps.shape[0]):
+        out[i, 0] = _kernel_into(snaps[i], w, out[i, 1:])
+    return out
+
+
+_f8_ptr = types.CPointer(types.float64)
+
+
+# Callback C ABI in-process: `score_cfunc.address` / `score_cfunc.ctypes` hanya valid di
+# dalam proses Python yang mengimpor modul ini dengan numba (bukan simbol yang diekspor
+# oleh `jiwa_kernel*.so`). Berguna untuk meneruskan kernel ke pustaka C/ctypes lain:
+# double score(const double *snap /* 18 */, const double *w /* 10 */, double *features /* 10 */)
+# Pointer mentah tidak membawa panjang: pemanggil WAJIB menyediakan tepat 18 double di
+# `snap`, 10 di `w` dan buffer 10 double di `features`; panjang lain = perilaku tak terdefinisi.
+@cfunc(types.float64(_f8_ptr, _f8_ptr, _f8_ptr))
+def score_cfunc(snap_ptr, w_ptr, feat_ptr):
+    snap = carray(snap_ptr, (N_FIELDS,))
+    w = carray(w_ptr, (N_FEATURES,))
+    feat = carray(feat_ptr, (N_FEATURES,))
+    return _kernel_into(snap, w, feat)
+
+
+if __name__ == "__main__":
+    cc.compile()
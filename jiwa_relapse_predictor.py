@@ -6,12 +6,66 @@ Prototype ini mencontohkan 10 fitur utama untuk memprediksi risiko kekambuhan
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from math import exp
-from typing import Dict
-
-
-@dataclass
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from math import exp, isfinite
+from operator import attrgetter, itemgetter, le
+from types import MappingProxyType
+from typing import ClassVar, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy opsional, hanya untuk jalur batch
+    np = None
+
+try:
+    from numba import float32, float64, guvectorize, njit
+except ImportError:  # pragma: no cover - numba opsional, fallback ke jalur Python
+    float32 = float64 = guvectorize = njit = None
+
+# Naikkan setiap kali `_kernel_into` berubah: modul AOT yang dikompilasi dari versi lain
+# diabaikan agar tidak diam-diam berbeda hasil dengan jalur lain.
+KERNEL_VERSION = 1
+
+try:
+    import jiwa_kernel  # modul AOT hasil `python _kernel_aot.py`
+except ImportError:  # pragma: no cover - belum dikompilasi
+    jiwa_kernel = None
+
+if jiwa_kernel is not None and (
+    not hasattr(jiwa_kernel, "kernel_version") or jiwa_kernel.kernel_version() != KERNEL_VERSION
+):
+    warnings.warn(
+        "jiwa_kernel dikompilasi dari versi kernel lain dan diabaikan; "
+        "jalankan ulang `python _kernel_aot.py`",
+        RuntimeWarning,
+    )
+    jiwa_kernel = None
+
+# Presisi default jalur kohort. float32 memangkas separuh lalu lintas memori dan
+# menggandakan lebar lajur SIMD; galat terhadap referensi float64 < 1e-4, jauh di bawah
+# resolusi sinyal digital phenotyping. Berikan `dtype=np.float64` bila perlu referensi.
+DEFAULT_BATCH_DTYPE = np.float32 if np is not None else None
+
+# Urutan baku 10 fitur; dipakai bersama oleh jalur skalar dan batch
+FEATURE_NAMES = (
+    "speech_rate_shift",
+    "pause_change",
+    "emotion_valence_drop",
+    "language_disorganization_rise",
+    "sleep_deviation",
+    "sleep_irregularity",
+    "activity_shift",
+    "circadian_disruption",
+    "medication_nonadherence",
+    "digital_withdrawal",
+)
+
+
+@dataclass(slots=True, frozen=True)
 class PatientSnapshot:
     # Data linguistik (chat/voice note)
     baseline_speech_rate_wpm: float
@@ -39,13 +93,239 @@ class PatientSnapshot:
     baseline_daily_messages: float
     current_daily_messages: float
 
+    # Domain valid field berbatas. Input dinormalisasi sekali saat konstruksi, sehingga
+    # jalur skalar Python (`_score_fused`) bisa melewati clamp yang terbukti tidak pernah
+    # aktif. Jalur kohort/kernel tetap clamp penuh karena bisa menerima baris mentah.
+    # Batas atas `inf` berarti tanpa batas atas; nilainya sendiri tetap wajib hingga
+    # (semua field non-finite ditolak di `__post_init__`). Read-only karena `_score_fused`
+    # bergantung pada domain ini.
+    FIELD_DOMAINS: ClassVar[Mapping[str, Tuple[float, float]]] = MappingProxyType(
+        {
+            "baseline_emotion_valence": (-1.0, 1.0),
+            "current_emotion_valence": (-1.0, 1.0),
+            "baseline_disorganization": (0.0, 1.0),
+            "current_disorganization": (0.0, 1.0),
+            "sleep_variability_hours": (0.0, float("inf")),
+            "medication_adherence_ratio": (0.0, 1.0),
+            "missed_followup_ratio": (0.0, 1.0),
+            "baseline_daily_messages": (0.0, float("inf")),
+            "current_daily_messages": (0.0, float("inf")),
+        }
+    )
+
+    def __post_init__(self) -> None:
+        # Satu kali baca semua field, dicek di level C (sum/map); loop Python hanya untuk
+        # snapshot yang memang ditolak atau perlu dinormalisasi.
+        row = _snapshot_row(self)
+        # NaN lolos dari perbandingan domain dan inf menghasilkan inf/inf = NaN di fitur;
+        # keduanya merambat ke risiko, jadi ditolak. NaN/inf di field mana pun membuat
+        # jumlahnya tak hingga; cek per field menyaring overflow dari nilai yang hingga.
+        if not isfinite(sum(row)):
+            bad = [name for name, value in zip(SNAPSHOT_FIELDS, row) if not isfinite(value)]
+            if bad:
+                raise ValueError(f"field harus bernilai hingga (bukan NaN/inf): {bad}")
+        values = _domain_values(row)
+        if not (all(map(le, _DOMAIN_LOWS, values)) and all(map(le, values, _DOMAIN_HIGHS))):
+            for name, value, low, high in zip(_DOMAIN_FIELDS, values, _DOMAIN_LOWS, _DOMAIN_HIGHS):
+                if value < low or value > high:
+                    object.__setattr__(self, name, min(high, max(low, value)))
+
+
+class OutcomeResult(NamedTuple):
+    """Outcome satu pasien dengan layout tetap; `to_dict()` hanya di batas API."""
+
+    relapse_risk_6_12m: float
+    readmission_risk: float
+    early_intervention_window_days: float
+    predicted_medication_adherence_3m: float
+    estimated_false_alarm_rate: float
+    features: Tuple[float, ...]  # berurutan `FEATURE_NAMES`
+
+    def to_dict(self) -> Dict[str, object]:
+        """Bentuk dict lama (termasuk `features` sebagai dict nama -> nilai)."""
+        result = self._asdict()
+        result["features"] = dict(zip(FEATURE_NAMES, self.features))
+        return result
+
+
+SNAPSHOT_FIELDS = tuple(f.name for f in fields(PatientSnapshot))
+_snapshot_row = attrgetter(*SNAPSHOT_FIELDS)
+
+# Bentuk berurutan `FIELD_DOMAINS` untuk validasi cepat (skalar dan matriks)
+_DOMAIN_FIELDS = tuple(PatientSnapshot.FIELD_DOMAINS)
+_DOMAIN_COLUMNS = tuple(SNAPSHOT_FIELDS.index(name) for name in _DOMAIN_FIELDS)
+_DOMAIN_LOWS = tuple(low for low, _ in PatientSnapshot.FIELD_DOMAINS.values())
+_DOMAIN_HIGHS = tuple(high for _, high in PatientSnapshot.FIELD_DOMAINS.values())
+_domain_values = itemgetter(*_DOMAIN_COLUMNS)
+
+
+def _clip01(x: float) -> float:
+    return 0.0 if x < 0.0 else (1.0 if x > 1.0 else x)
+
+
+class FeatureBatch(dict):
+    """Kohort pasien dalam tata letak Structure-of-Arrays (satu array per field)."""
+
+    @classmethod
+    def from_snapshots(
+        cls, snaps: List[PatientSnapshot], dtype=DEFAULT_BATCH_DTYPE
+    ) -> "FeatureBatch":
+        if np is None:
+            raise ImportError("FeatureBatch membutuhkan numpy")
+        n = len(snaps)
+        return cls(
+            (name, np.fromiter(map(attrgetter(name), snaps), dtype=dtype, count=n))
+            for name in SNAPSHOT_FIELDS
+        )
+
+
+def _clip01_inplace(arr: "np.ndarray") -> "np.ndarray":
+    # `arr` selalu array sementara hasil ekspresi, jadi aman ditimpa tanpa alokasi baru
+    return np.clip(arr, 0.0, 1.0, out=arr)
+
+
+def _relative_change_batch(current, baseline):
+    # Pembagi diganti 1 saat baseline == 0 agar tidak muncul warning div-by-zero
+    safe_baseline = np.where(baseline == 0, 1.0, np.abs(baseline))
+    return np.where(baseline == 0, 0.0, np.abs(current - baseline) / safe_baseline)
+
+
+if njit is not None:
+    # nogil: kernel bisa dijalankan paralel dari thread Python biasa (`_score_cohort`)
+    @njit(nogil=True, cache=True, fastmath=True)
+    def _kernel_into(s, w, f):
+        """Ekstraksi fitur + sigmoid dalam satu fungsi terkompilasi.
+
+        `s` adalah 18 field `PatientSnapshot` (urutan `SNAPSHOT_FIELDS`), `w` bobot
+        dalam urutan `FEATURE_NAMES`. Fitur ditulis ke `f[0..9]`, risiko dikembalikan.
+        Clamp penuh dipertahankan (min/max tanpa branch setelah dikompilasi) karena baris
+        mentah dari modul AOT dan `_score_cohort` tidak melewati `PatientSnapshot.__post_init__`.
+        """
+        f[0] = min(1.0, max(0.0, abs(s[1] - s[0]) / abs(s[0]))) if s[0] != 0.0 else 0.0
+        f[1] = min(1.0, max(0.0, abs(s[3] - s[2]) / abs(s[2]))) if s[2] != 0.0 else 0.0
+        f[2] = min(1.0, max(0.0, max(0.0, s[4] - s[5]) / 2.0))
+        f[3] = min(1.0, max(0.0, max(0.0, s[7] - s[6])))
+        f[4] = min(1.0, max(0.0, abs(s[9] - s[8]) / 4.0))
+        f[5] = min(1.0, max(0.0, s[10] / 3.0))
+        f[6] = min(1.0, max(0.0, abs(s[12] - s[11]) / abs(s[11]))) if s[11] != 0.0 else 0.0
+        f[7] = min(1.0, max(0.0, abs(s[13]) / 4.0))
+        f[8] = min(1.0, max(0.0, 1.0 - s[14]))
+        f[9] = min(1.0, max(0.0, max(0.0, s[16] - s[17]) / max(1.0, s[16])))
+        score = (
+            w[0] * f[0]
+            + w[1] * f[1]
+            + w[2] * f[2]
+            + w[3] * f[3]
+            + w[4] * f[4]
+            + w[5] * f[5]
+            + w[6] * f[6]
+            + w[7] * f[7]
+            + w[8] * f[8]
+            + w[9] * f[9]
+        )
+        return 1.0 / (1.0 + exp(-(score - 3.5)))
+
+    @lru_cache(maxsize=None)
+    def _score_gufunc():
+        """Gufunc kohort paralel, dikompilasi saat pertama dipakai (bukan saat import).
+
+        Hanya dua signature (float32 default kohort, float64 referensi) supaya
+        kompilasi pertama tetap singkat.
+        """
+
+        @guvectorize(
+            [
+                (float32[:], float32[:], float32[:], float32[:]),
+                (float64[:], float64[:], float64[:], float64[:]),
+            ],
+            "(n),(m)->(),(m)",
+            target="parallel",
+            nopython=True,
+            fastmath=True,
+        )
+        def score_gufunc(snap, w, risk_out, feat_out):
+            risk_out[0] = _kernel_into(snap, w, feat_out)
+
+        return score_gufunc
+
+    @njit(nogil=True, cache=True, fastmath=True)
+    def _score_rows(snaps, w, risk_out, feat_out):
+        for i in range(snaps.shape[0]):
+            risk_out[i] = _kernel_into(snaps[i], w, feat_out[i])
+
+else:
+    _score_gufunc = _score_rows = None
+
+
+def _aot_score_matrix(dtype):
+    """`score_matrix` AOT untuk `dtype` (float32/float64), atau None bila tidak tersedia."""
+    if jiwa_kernel is None:
+        return None
+    kind = np.dtype(dtype)
+    if kind == np.float32:
+        return jiwa_kernel.score_matrix_f4
+    if kind == np.float64:
+        return jiwa_kernel.score_matrix
+    return None
+
+
+def _snapshot_matrix(snaps: List[PatientSnapshot], dtype=DEFAULT_BATCH_DTYPE) -> "np.ndarray":
+    """Kohort sebagai matriks (N, 18), urutan kolom `SNAPSHOT_FIELDS`."""
+    return np.array(list(map(_snapshot_row, snaps)), dtype=dtype).reshape(
+        len(snaps), len(SNAPSHOT_FIELDS)
+    )
+
+
+def _validate_snapshot_matrix(snaps_matrix, dtype=DEFAULT_BATCH_DTYPE) -> "np.ndarray":
+    """Salinan matriks (N, 18) mentah dengan aturan yang sama seperti `PatientSnapshot`.
+
+    Padanan vektor dari `__post_init__`: NaN/inf ditolak, kolom `FIELD_DOMAINS` di-clip.
+    """
+    matrix = np.array(snaps_matrix, dtype=dtype)
+    if matrix.ndim != 2 or matrix.shape[1] != len(SNAPSHOT_FIELDS):
+        raise ValueError(
+            f"snaps_matrix harus bermatriks (N, {len(SNAPSHOT_FIELDS)}), bukan {matrix.shape}"
+        )
+    finite = np.isfinite(matrix)
+    if not finite.all():
+        bad = [SNAPSHOT_FIELDS[i] for i in np.flatnonzero(~finite.all(axis=0))]
+        raise ValueError(f"field harus bernilai hingga (bukan NaN/inf): {bad}")
+    columns = list(_DOMAIN_COLUMNS)
+    matrix[:, columns] = np.clip(matrix[:, columns], _DOMAIN_LOWS, _DOMAIN_HIGHS)
+    return matrix
+
+
+def _score_cohort(
+    snaps_matrix: "np.ndarray", weights: "np.ndarray", n_threads: Optional[int] = None
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Skoring matriks (N, 18) paralel lewat thread pool di atas kernel numba `nogil`.
+
+    Tiap worker menulis potongan baris `[i0:i1]` langsung ke buffer output bersama,
+    tanpa IPC. `weights` harus ber-dtype sama dengan `snaps_matrix`; pakai
+    `JiwaRelapsePredictor.score_cohort` yang menyiapkan keduanya.
+    """
+    n = snaps_matrix.shape[0]
+    risk = np.empty(n, dtype=snaps_matrix.dtype)
+    features = np.empty((n, len(FEATURE_NAMES)), dtype=snaps_matrix.dtype)
+    n_threads = max(1, min(n_threads or os.cpu_count() or 1, n))
+    bounds = np.linspace(0, n, n_threads + 1).astype(np.intp)
+    with ThreadPoolExecutor(max_workers=n_threads) as pool:
+        chunks = [
+            pool.submit(
+                _score_rows, snaps_matrix[i0:i1], weights, risk[i0:i1], features[i0:i1]
+            )
+            for i0, i1 in zip(bounds[:-1], bounds[1:])
+        ]
+        for chunk in chunks:
+            chunk.result()
+    return risk, features
+
 
 class JiwaRelapsePredictor:
     """Model rule-based ringan untuk triase awal risiko relapse."""
 
-    def __init__(self) -> None:
-        # Bobot fitur untuk komputasi risiko relapse
-        self.weights = {
+    DEFAULT_WEIGHTS: ClassVar[Mapping[str, float]] = MappingProxyType(
+        {
             "speech_rate_shift": 1.1,
             "pause_change": 0.6,
             "emotion_valence_drop": 1.2,
@@ -57,111 +337,308 @@ class JiwaRelapsePredictor:
             "medication_nonadherence": 1.5,
             "digital_withdrawal": 0.8,
         }
+    )
 
-    @staticmethod
-    def _bounded(value: float, low: float = 0.0, high: float = 1.0) -> float:
-        return max(low, min(high, value))
-
-    @staticmethod
-    def _relative_change(current: float, baseline: float) -> float:
-        if baseline == 0:
-            return 0.0
-        return abs(current - baseline) / abs(baseline)
-
-    def extract_10_features(self, p: PatientSnapshot) -> Dict[str, float]:
-        """10 fitur digital phenotyping utama."""
-        speech_rate_shift = self._bounded(
-            self._relative_change(p.current_speech_rate_wpm, p.baseline_speech_rate_wpm)
-        )
-        pause_change = self._bounded(
-            self._relative_change(p.current_pause_seconds, p.baseline_pause_seconds)
-        )
-        emotion_valence_drop = self._bounded(
+    def __init__(self, weights: Optional[Mapping[str, float]] = None) -> None:
+        """`weights` opsional harus memuat tepat satu bobot untuk tiap nama di `FEATURE_NAMES`.
+
+        `self.weights` bersifat read-only (`MappingProxyType`): berbeda dari versi awal,
+        `predictor.weights[k] = v` kini memicu `TypeError`. Untuk bobot lain, buat
+        predictor baru, mis. `JiwaRelapsePredictor({**predictor.weights, k: v})`.
+        """
+        # Salinan berurutan di bawah diturunkan sekali dari bobot ini, jadi mutasi setelah
+        # konstruksi tidak boleh terjadi.
+        if weights is None:
+            weights = self.DEFAULT_WEIGHTS
+        if set(weights) != set(FEATURE_NAMES):
+            missing = sorted(set(FEATURE_NAMES) - set(weights))
+            unknown = sorted(set(weights) - set(FEATURE_NAMES))
+            raise ValueError(
+                "weights harus memuat tepat FEATURE_NAMES; "
+                f"kurang: {missing}, tidak dikenal: {unknown}"
+            )
+        self.weights = MappingProxyType(dict(weights))
+        # Salinan bobot berurutan (FEATURE_NAMES): tuple untuk jalur skalar,
+        # vektor kontigu untuk kernel terkompilasi dan perkalian matriks batch. `_w_vec`
+        # adalah master float64; jalur kohort menurunkannya ke `dtype` yang diminta.
+        self._weight_tuple = tuple(self.weights[k] for k in FEATURE_NAMES)
+        self._weight_items = tuple(zip(FEATURE_NAMES, self._weight_tuple))
+        if np is not None:
+            self._w_vec = np.asarray(self._weight_tuple, dtype=np.float64)
+
+    def _score_fused(self, p: PatientSnapshot) -> Tuple[float, Tuple[float, ...]]:
+        """Fitur dan risiko dalam satu lintasan, tanpa dict perantara.
+
+        Mengembalikan `(risk, features)` dengan `features` berurutan `FEATURE_NAMES`.
+        """
+        # Domain input sudah dinormalisasi di `PatientSnapshot.__post_init__`, sehingga
+        # hanya batas atas yang perlu dipotong, dan sebagian fitur tidak perlu clamp sama sekali.
+        b = p.baseline_speech_rate_wpm
+        x = abs(p.current_speech_rate_wpm - b) / abs(b) if b != 0 else 0.0
+        speech_rate_shift = x if x < 1.0 else 1.0
+        b = p.baseline_pause_seconds
+        x = abs(p.current_pause_seconds - b) / abs(b) if b != 0 else 0.0
+        pause_change = x if x < 1.0 else 1.0
+        emotion_valence_drop = (
             max(0.0, p.baseline_emotion_valence - p.current_emotion_valence) / 2.0
         )
-        language_disorganization_rise = self._bounded(
-            max(0.0, p.current_disorganization - p.baseline_disorganization)
+        language_disorganization_rise = max(
+            0.0, p.current_disorganization - p.baseline_disorganization
         )
-        sleep_deviation = self._bounded(
-            abs(p.current_sleep_hours - p.baseline_sleep_hours) / 4.0
+        x = abs(p.current_sleep_hours - p.baseline_sleep_hours) / 4.0
+        sleep_deviation = x if x < 1.0 else 1.0
+        x = p.sleep_variability_hours / 3.0
+        sleep_irregularity = x if x < 1.0 else 1.0
+        b = p.baseline_activity_steps
+        x = abs(p.current_activity_steps - b) / abs(b) if b != 0 else 0.0
+        activity_shift = x if x < 1.0 else 1.0
+        x = abs(p.circadian_shift_hours) / 4.0
+        circadian_disruption = x if x < 1.0 else 1.0
+        medication_nonadherence = 1.0 - p.medication_adherence_ratio
+        b = p.baseline_daily_messages
+        digital_withdrawal = max(0.0, b - p.current_daily_messages) / max(1.0, b)
+
+        w = self._weight_tuple
+        score = (
+            w[0] * speech_rate_shift
+            + w[1] * pause_change
+            + w[2] * emotion_valence_drop
+            + w[3] * language_disorganization_rise
+            + w[4] * sleep_deviation
+            + w[5] * sleep_irregularity
+            + w[6] * activity_shift
+            + w[7] * circadian_disruption
+            + w[8] * medication_nonadherence
+            + w[9] * digital_withdrawal
         )
-        sleep_irregularity = self._bounded(p.sleep_variability_hours / 3.0)
-        activity_shift = self._bounded(
-            self._relative_change(p.current_activity_steps, p.baseline_activity_steps)
-        )
-        circadian_disruption = self._bounded(abs(p.circadian_shift_hours) / 4.0)
-        medication_nonadherence = self._bounded(1.0 - p.medication_adherence_ratio)
-        digital_withdrawal = self._bounded(
-            max(0.0, p.baseline_daily_messages - p.current_daily_messages)
-            / max(1.0, p.baseline_daily_messages)
+        features = (
+            speech_rate_shift,
+            pause_change,
+            emotion_valence_drop,
+            language_disorganization_rise,
+            sleep_deviation,
+            sleep_irregularity,
+            activity_shift,
+            circadian_disruption,
+            medication_nonadherence,
+            digital_withdrawal,
         )
+        return 1.0 / (1.0 + exp(-(score - 3.5))), features
 
+    def extract_10_features(self, p: PatientSnapshot) -> Dict[str, float]:
+        """10 fitur digital phenotyping utama."""
+        return dict(zip(FEATURE_NAMES, self._score_fused(p)[1]))
+
+    def extract_10_features_batch(self, batch: FeatureBatch) -> Dict[str, "np.ndarray"]:
+        """Versi vektor dari `extract_10_features` untuk kohort (N > 1)."""
+        b = batch
+        # Clamp penuh: `FeatureBatch` bisa dibentuk dari array mentah tanpa `__post_init__`
         return {
-            "speech_rate_shift": speech_rate_shift,
-            "pause_change": pause_change,
-            "emotion_valence_drop": emotion_valence_drop,
-            "language_disorganization_rise": language_disorganization_rise,
-            "sleep_deviation": sleep_deviation,
-            "sleep_irregularity": sleep_irregularity,
-            "activity_shift": activity_shift,
-            "circadian_disruption": circadian_disruption,
-            "medication_nonadherence": medication_nonadherence,
-            "digital_withdrawal": digital_withdrawal,
+            "speech_rate_shift": _clip01_inplace(
+                _relative_change_batch(b["current_speech_rate_wpm"], b["baseline_speech_rate_wpm"])
+            ),
+            "pause_change": _clip01_inplace(
+                _relative_change_batch(b["current_pause_seconds"], b["baseline_pause_seconds"])
+            ),
+            "emotion_valence_drop": _clip01_inplace(
+                np.maximum(0.0, b["baseline_emotion_valence"] - b["current_emotion_valence"]) / 2.0
+            ),
+            "language_disorganization_rise": _clip01_inplace(
+                np.maximum(0.0, b["current_disorganization"] - b["baseline_disorganization"])
+            ),
+            "sleep_deviation": _clip01_inplace(
+                np.abs(b["current_sleep_hours"] - b["baseline_sleep_hours"]) / 4.0
+            ),
+            "sleep_irregularity": _clip01_inplace(b["sleep_variability_hours"] / 3.0),
+            "activity_shift": _clip01_inplace(
+                _relative_change_batch(b["current_activity_steps"], b["baseline_activity_steps"])
+            ),
+            "circadian_disruption": _clip01_inplace(np.abs(b["circadian_shift_hours"]) / 4.0),
+            "medication_nonadherence": _clip01_inplace(1.0 - b["medication_adherence_ratio"]),
+            "digital_withdrawal": _clip01_inplace(
+                np.maximum(0.0, b["baseline_daily_messages"] - b["current_daily_messages"])
+                / np.maximum(1.0, b["baseline_daily_messages"])
+            ),
         }
 
     def relapse_probability_6_12_months(self, features: Dict[str, float]) -> float:
         """Probabilitas kekambuhan 6-12 bulan (0..1)."""
-        score = sum(features[k] * self.weights[k] for k in self.weights)
+        score = sum(features[k] * w for k, w in self._weight_items)
         calibrated = score - 3.5
         return 1 / (1 + exp(-calibrated))
 
-    def estimate_outcomes(self, p: PatientSnapshot) -> Dict[str, float]:
-        """Outcome utama sesuai PICO: relapse, readmission, intervensi dini, adherence, false alarm."""
-        features = self.extract_10_features(p)
-        relapse_risk = self.relapse_probability_6_12_months(features)
-
-        # Readmission risk diasumsikan subset dari relapse risk
-        readmission_risk = self._bounded(relapse_risk * 0.72 + 0.08)
+    def score_batch(
+        self, snaps: List[PatientSnapshot], dtype=DEFAULT_BATCH_DTYPE
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Risiko relapse (N,) dan matriks fitur (N, 10) untuk satu kohort."""
+        return self._score_matrix(_snapshot_matrix(snaps, dtype))
+
+    def _score_matrix(self, matrix: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+        """`score_batch` untuk matriks (N, 18) yang sudah tervalidasi, ber-dtype hasil."""
+        w = self._w_vec.astype(matrix.dtype, copy=False)
+        aot = _aot_score_matrix(matrix.dtype)
+        if aot is not None:
+            # Kernel AOT didahulukan: sudah terkompilasi, tanpa warm-up JIT per proses
+            out = aot(matrix, w)
+            return out[:, 0], out[:, 1:]
+        if _score_gufunc is not None:
+            return _score_gufunc()(matrix, w)
+        features = self.extract_10_features_batch(FeatureBatch(zip(SNAPSHOT_FIELDS, matrix.T)))
+        feature_matrix = np.column_stack([features[k] for k in FEATURE_NAMES])
+        score = feature_matrix @ w
+        return 1.0 / (1.0 + np.exp(-(score - 3.5))), feature_matrix
+
+    def score_cohort(
+        self,
+        snaps: List[PatientSnapshot],
+        dtype=DEFAULT_BATCH_DTYPE,
+        n_threads: Optional[int] = None,
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Seperti `score_batch`, tetapi paralel lewat thread pool dengan `n_threads` worker.
+
+        Tanpa numba tidak ada kernel `nogil`, jadi jatuh kembali ke `score_batch`.
+        """
+        return self._score_cohort_matrix(_snapshot_matrix(snaps, dtype), n_threads)
+
+    def score_cohort_matrix(
+        self,
+        snaps_matrix: "np.ndarray",
+        dtype=DEFAULT_BATCH_DTYPE,
+        n_threads: Optional[int] = None,
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """`score_cohort` langsung dari matriks mentah (N, 18), kolom urut `SNAPSHOT_FIELDS`.
+
+        Tanpa membentuk `PatientSnapshot` per baris: validasinya dilakukan sekali secara
+        vektor (ValueError untuk bentuk salah atau NaN/inf; kolom ber-domain di-clip).
+        Input tidak diubah.
+        """
+        return self._score_cohort_matrix(
+            _validate_snapshot_matrix(snaps_matrix, dtype), n_threads
+        )
 
-        # Waktu intervensi dini (hari): makin tinggi risiko, makin singkat jendela aman
-        early_intervention_window_days = max(3.0, 60.0 * (1.0 - relapse_risk))
+    def _score_cohort_matrix(
+        self, matrix: "np.ndarray", n_threads: Optional[int]
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        if _score_rows is None:
+            return self._score_matrix(matrix)
+        return _score_cohort(matrix, self._w_vec.astype(matrix.dtype, copy=False), n_threads)
+
+    def _score_once_batch(
+        self, snaps: List[PatientSnapshot], dtype=DEFAULT_BATCH_DTYPE
+    ) -> Tuple[Dict[str, "np.ndarray"], Dict[str, "np.ndarray"]]:
+        """Versi kohort `_score_once`; semua cabang diganti operasi vektor tanpa branch."""
+        n = len(snaps)
+        relapse_risk, feature_matrix = self.score_batch(snaps, dtype)
+        adherence = np.fromiter(
+            map(attrgetter("medication_adherence_ratio"), snaps), dtype=dtype, count=n
+        )
+        missed_followup = np.fromiter(
+            map(attrgetter("missed_followup_ratio"), snaps), dtype=dtype, count=n
+        )
 
-        # Prediksi kepatuhan obat 3 bulan ke depan
-        predicted_med_adherence_3m = self._bounded(
-            p.medication_adherence_ratio - 0.25 * relapse_risk - 0.15 * p.missed_followup_ratio
+        # relapse_risk di [0, 1] sehingga readmission_risk pasti di [0.08, 0.80]
+        readmission_risk = relapse_risk * 0.72 + 0.08
+        early_intervention_window_days = np.maximum(3.0, 60.0 * (1.0 - relapse_risk))
+        predicted_med_adherence_3m = _clip01_inplace(
+            adherence - 0.25 * relapse_risk - 0.15 * missed_followup
         )
+        # Mask boolean dikalikan langsung: tidak ada prediksi cabang per pasien
+        false_alarm_rate = 0.10 + 0.08 * (relapse_risk > 0.55).astype(dtype)
 
-        # Estimasi false alarm rate (konservatif): naik saat cutoff sensitif
-        # Di sini diasumsikan mode sensitif saat risiko > 0.55
-        false_alarm_rate = 0.18 if relapse_risk > 0.55 else 0.10
+        # Risiko sudah >= 0, jadi hanya batas atas yang perlu dipotong
+        routine_relapse_risk = np.minimum(relapse_risk + 0.08, 1.0)
+        routine_readmission_risk = readmission_risk + 0.12
+        routine_intervention_window_days = np.maximum(1.0, early_intervention_window_days - 14.0)
 
-        return {
+        outcomes = {
             "relapse_risk_6_12m": relapse_risk,
             "readmission_risk": readmission_risk,
             "early_intervention_window_days": early_intervention_window_days,
             "predicted_medication_adherence_3m": predicted_med_adherence_3m,
             "estimated_false_alarm_rate": false_alarm_rate,
-            "features": features,
+            "features": dict(zip(FEATURE_NAMES, feature_matrix.T)),
         }
+        comparison = {
+            "ai_relapse_risk_6_12m": relapse_risk,
+            "routine_relapse_risk_6_12m": routine_relapse_risk,
+            "ai_readmission_risk": readmission_risk,
+            "routine_readmission_risk": routine_readmission_risk,
+            "ai_early_intervention_window_days": early_intervention_window_days,
+            "routine_early_intervention_window_days": routine_intervention_window_days,
+            "ai_estimated_false_alarm_rate": false_alarm_rate,
+        }
+        return outcomes, comparison
+
+    def estimate_outcomes_batch(
+        self, snaps: List[PatientSnapshot], dtype=DEFAULT_BATCH_DTYPE
+    ) -> Dict[str, "np.ndarray"]:
+        """Versi kohort `estimate_outcomes`: tiap outcome berupa array (N,)."""
+        return self._score_once_batch(snaps, dtype)[0]
+
+    def compare_with_routine_followup_batch(
+        self, snaps: List[PatientSnapshot], dtype=DEFAULT_BATCH_DTYPE
+    ) -> Dict[str, "np.ndarray"]:
+        """Versi kohort `compare_with_routine_followup`."""
+        return self._score_once_batch(snaps, dtype)[1]
+
+    def _score_once(self, p: PatientSnapshot) -> Tuple[OutcomeResult, Dict[str, float]]:
+        """Outcome AI dan perbandingan vs follow-up rutin dari satu kali skoring."""
+        # Jalur Python terfusi lebih cepat daripada memanggil `_kernel_into` untuk satu pasien:
+        # konversi ke ndarray + dispatch numba lebih mahal dari aritmetikanya sendiri.
+        # Kernel terkompilasi dipakai di jalur kohort (`score_batch`).
+        relapse_risk, feature_vec = self._score_fused(p)
+
+        # Readmission risk diasumsikan subset dari relapse risk; relapse_risk di [0, 1]
+        # sehingga hasilnya pasti di [0.08, 0.80] tanpa clamp
+        readmission_risk = relapse_risk * 0.72 + 0.08
 
-    def compare_with_routine_followup(self, p: PatientSnapshot) -> Dict[str, float]:
-        """Perbandingan kasar AI monitoring vs follow-up rutin tanpa AI."""
-        ai = self.estimate_outcomes(p)
+        # Waktu intervensi dini (hari): makin tinggi risiko, makin singkat jendela aman
+        early_intervention_window_days = max(3.0, 60.0 * (1.0 - relapse_risk))
 
-        # Hipotesis: tanpa AI, deteksi lebih lambat + readmission lebih tinggi
-        routine_relapse_risk = self._bounded(ai["relapse_risk_6_12m"] + 0.08)
-        routine_readmission_risk = self._bounded(ai["readmission_risk"] + 0.12)
-        routine_intervention_window_days = max(1.0, ai["early_intervention_window_days"] - 14.0)
+        # Prediksi kepatuhan obat 3 bulan ke depan
+        predicted_med_adherence_3m = _clip01(
+            p.medication_adherence_ratio - 0.25 * relapse_risk - 0.15 * p.missed_followup_ratio
+        )
 
-        return {
-            "ai_relapse_risk_6_12m": ai["relapse_risk_6_12m"],
+        # Estimasi false alarm rate (konservatif): naik saat cutoff sensitif
+        # Di sini diasumsikan mode sensitif saat risiko > 0.55
+        false_alarm_rate = 0.18 if relapse_risk > 0.55 else 0.10
+
+        # Hipotesis: tanpa AI, deteksi lebih lambat + readmission lebih tinggi
+        routine_relapse_risk = min(1.0, relapse_risk + 0.08)
+        routine_readmission_risk = readmission_risk + 0.12
+        routine_intervention_window_days = max(1.0, early_intervention_window_days - 14.0)
+
+        outcomes = OutcomeResult(
+            relapse_risk,
+            readmission_risk,
+            early_intervention_window_days,
+            predicted_med_adherence_3m,
+            false_alarm_rate,
+            feature_vec,
+        )
+        comparison = {
+            "ai_relapse_risk_6_12m": relapse_risk,
             "routine_relapse_risk_6_12m": routine_relapse_risk,
-            "ai_readmission_risk": ai["readmission_risk"],
+            "ai_readmission_risk": readmission_risk,
             "routine_readmission_risk": routine_readmission_risk,
-            "ai_early_intervention_window_days": ai["early_intervention_window_days"],
+            "ai_early_intervention_window_days": early_intervention_window_days,
             "routine_early_intervention_window_days": routine_intervention_window_days,
-            "ai_estimated_false_alarm_rate": ai["estimated_false_alarm_rate"],
+            "ai_estimated_false_alarm_rate": false_alarm_rate,
         }
+        return outcomes, comparison
+
+    def score(self, p: PatientSnapshot) -> Tuple[OutcomeResult, Dict[str, float]]:
+        """`(estimate_outcomes, compare_with_routine_followup)` sekaligus tanpa skoring ulang."""
+        return self._score_once(p)
+
+    def estimate_outcomes(self, p: PatientSnapshot) -> OutcomeResult:
+        """Outcome utama sesuai PICO: relapse, readmission, intervensi dini, adherence, false alarm."""
+        return self._score_once(p)[0]
+
+    def compare_with_routine_followup(self, p: PatientSnapshot) -> Dict[str, float]:
+        """Perbandingan kasar AI monitoring vs follow-up rutin tanpa AI."""
+        return self._score_once(p)[1]
 
 
 def demo() -> None:
@@ -187,15 +664,14 @@ def demo() -> None:
     )
 
     predictor = JiwaRelapsePredictor()
-    outcomes = predictor.estimate_outcomes(patient)
-    comparison = predictor.compare_with_routine_followup(patient)
+    outcomes, comparison = predictor.score(patient)
 
     print("=== 10 Fitur Digital Phenotyping ===")
-    for name, value in outcomes["features"].items():
+    for name, value in zip(FEATURE_NAMES, outcomes.features):
         print(f"- {name}: {value:.3f}")
 
     print("\n=== Outcome AI Monitoring ===")
-    for k, v in outcomes.items():
+    for k, v in zip(OutcomeResult._fields, outcomes):
         if k != "features":
             print(f"- {k}: {v:.3f}")
 
@@ -0,0 +1,271 @@
+"""Konsistensi semua jalur skoring terhadap jalur skalar `JiwaRelapsePredictor.score`."""
+
+import math
+import random
+
+import pytest
+
+import jiwa_relapse_predictor as jrp
+from jiwa_relapse_predictor import (
+    FEATURE_NAMES,
+    SNAPSHOT_FIELDS,
+    JiwaRelapsePredictor,
+    PatientSnapshot,
+)
+
+needs_numpy = pytest.mark.skipif(jrp.np is None, reason="membutuhkan numpy")
+needs_numba = pytest.mark.skipif(jrp.njit is None, reason="membutuhkan numba")
+
+# float32 menyimpan fitur dan skor dengan presisi ~1e-7 relatif; lihat DEFAULT_BATCH_DTYPE
+TOLERANCE = {"float32": 1e-4, "float64": 1e-12}
+
+# Rentang acak per field, sengaja melewati FIELD_DOMAINS agar clamp ikut teruji
+FIELD_RANGES = {
+    "baseline_speech_rate_wpm": (60.0, 200.0),
+    "current_speech_rate_wpm": (0.0, 260.0),
+    "baseline_pause_seconds": (0.1, 2.0),
+    "current_pause_seconds": (0.0, 4.0),
+    "baseline_emotion_valence": (-1.5, 1.5),
+    "current_emotion_valence": (-1.5, 1.5),
+    "baseline_disorganization": (-0.3, 1.3),
+    "current_disorganization": (-0.3, 1.3),
+    "baseline_sleep_hours": (4.0, 10.0),
+    "current_sleep_hours": (0.0, 14.0),
+    "sleep_variability_hours": (-1.0, 5.0),
+    "baseline_activity_steps": (500.0, 12000.0),
+    "current_activity_steps": (0.0, 20000.0),
+    "circadian_shift_hours": (-6.0, 6.0),
+    "medication_adherence_ratio": (-0.2, 1.2),
+    "missed_followup_ratio": (-0.2, 1.2),
+    "baseline_daily_messages": (-5.0, 80.0),
+    "current_daily_messages": (-5.0, 80.0),
+}
+ZERO_BASELINES = (
+    "baseline_speech_rate_wpm",
+    "baseline_pause_seconds",
+    "baseline_activity_steps",
+    "baseline_daily_messages",
+)
+
+
+def _raw_rows(n, seed=0):
+    """`n` baris mentah (urut SNAPSHOT_FIELDS); tiap baris ke-5 ber-baseline nol."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        row = {name: rng.uniform(*FIELD_RANGES[name]) for name in SNAPSHOT_FIELDS}
+        if i % 5 == 0:
+            row.update(dict.fromkeys(ZERO_BASELINES, 0.0))
+        rows.append([row[name] for name in SNAPSHOT_FIELDS])
+    return rows
+
+
+def _snapshots(n, seed=0):
+    return [PatientSnapshot(*row) for row in _raw_rows(n, seed)]
+
+
+def _scalar(predictor, snaps):
+    """Referensi: risiko dan fitur dari jalur skalar, satu pasien per panggilan."""
+    results = [predictor.estimate_outcomes(p) for p in snaps]
+    return [r.relapse_risk_6_12m for r in results], [r.features for r in results]
+
+
+def _assert_matches_scalar(predictor, snaps, risk, features, dtype):
+    expected_risk, expected_features = _scalar(predictor, snaps)
+    tol = TOLERANCE[dtype]
+    assert risk.dtype == dtype and features.dtype == dtype
+    assert risk.shape == (len(snaps),)
+    assert features.shape == (len(snaps), len(FEATURE_NAMES))
+    assert jrp.np.allclose(risk, expected_risk, rtol=0.0, atol=tol)
+    assert jrp.np.allclose(features, expected_features, rtol=0.0, atol=tol)
+
+
+def _numpy_path(predictor, snaps, dtype, monkeypatch):
+    monkeypatch.setattr(jrp, "_aot_score_matrix", lambda dtype: None)
+    monkeypatch.setattr(jrp, "_score_gufunc", None)
+    return predictor.score_batch(snaps, dtype)
+
+
+def _gufunc_path(predictor, snaps, dtype, monkeypatch):
+    if jrp.njit is None:
+        pytest.skip("membutuhkan numba")
+    monkeypatch.setattr(jrp, "_aot_score_matrix", lambda dtype: None)
+    return predictor.score_batch(snaps, dtype)
+
+
+def _aot_path(predictor, snaps, dtype, monkeypatch):
+    if jrp.jiwa_kernel is None:
+        pytest.skip("modul AOT jiwa_kernel belum dikompilasi")
+    return predictor.score_batch(snaps, dtype)
+
+
+def _thread_pool_path(predictor, snaps, dtype, monkeypatch):
+    if jrp.njit is None:
+        pytest.skip("membutuhkan numba")
+    return predictor.score_cohort(snaps, dtype, n_threads=4)
+
+
+def _cohort_fallback_path(predictor, snaps, dtype, monkeypatch):
+    monkeypatch.setattr(jrp, "_score_rows", None)
+    monkeypatch.setattr(jrp, "_aot_score_matrix", lambda dtype: None)
+    monkeypatch.setattr(jrp, "_score_gufunc", None)
+    return predictor.score_cohort(snaps, dtype)
+
+
+BATCH_PATHS = [
+    _numpy_path,
+    _gufunc_path,
+    _aot_path,
+    _thread_pool_path,
+    _cohort_fallback_path,
+]
+
+
+def test_fused_matches_feature_dict_and_weighted_sum():
+    predictor = JiwaRelapsePredictor()
+    for p in _snapshots(50):
+        outcome = predictor.estimate_outcomes(p)
+        features = predictor.extract_10_features(p)
+        assert tuple(features) == FEATURE_NAMES
+        assert outcome.features == tuple(features.values())
+        assert outcome.relapse_risk_6_12m == pytest.approx(
+            predictor.relapse_probability_6_12_months(features), abs=1e-15
+        )
+        assert all(0.0 <= value <= 1.0 for value in features.values())
+
+
+def test_zero_baselines_give_zero_relative_change():
+    p = _snapshots(1)[0]
+    assert all(getattr(p, name) == 0.0 for name in ZERO_BASELINES)
+    features = JiwaRelapsePredictor().extract_10_features(p)
+    assert features["speech_rate_shift"] == 0.0
+    assert features["pause_change"] == 0.0
+    assert features["activity_shift"] == 0.0
+    assert features["digital_withdrawal"] == 0.0
+
+
+def test_out_of_domain_fields_are_clamped_once():
+    row = dict(zip(SNAPSHOT_FIELDS, _raw_rows(1, seed=3)[0]))
+    row.update(
+        current_emotion_valence=4.0,
+        baseline_disorganization=-2.0,
+        sleep_variability_hours=-1.0,
+        medication_adherence_ratio=1.7,
+        current_daily_messages=-3.0,
+    )
+    p = PatientSnapshot(**row)
+    assert p.current_emotion_valence == 1.0
+    assert p.baseline_disorganization == 0.0
+    assert p.sleep_variability_hours == 0.0
+    assert p.medication_adherence_ratio == 1.0
+    assert p.current_daily_messages == 0.0
+    for name, (low, high) in PatientSnapshot.FIELD_DOMAINS.items():
+        assert low <= getattr(p, name) <= high
+
+
+def test_field_domains_are_read_only():
+    with pytest.raises(TypeError):
+        PatientSnapshot.FIELD_DOMAINS["current_emotion_valence"] = (-2.0, 2.0)
+
+
+@pytest.mark.parametrize("value", [math.nan, math.inf, -math.inf])
+@pytest.mark.parametrize("name", ["current_pause_seconds", "current_emotion_valence"])
+def test_non_finite_snapshot_is_rejected(name, value):
+    row = dict(zip(SNAPSHOT_FIELDS, _raw_rows(1, seed=1)[0]), **{name: value})
+    with pytest.raises(ValueError, match=name):
+        PatientSnapshot(**row)
+
+
+def test_huge_finite_values_are_accepted():
+    # Jumlah field overflow ke inf, tetapi tiap nilai hingga
+    row = dict(zip(SNAPSHOT_FIELDS, _raw_rows(1, seed=2)[0]))
+    row.update(baseline_activity_steps=1e308, current_activity_steps=1e308)
+    PatientSnapshot(**row)
+
+
+def test_weights_must_cover_feature_names():
+    weights = dict(JiwaRelapsePredictor.DEFAULT_WEIGHTS)
+    del weights["sleep_deviation"]
+    with pytest.raises(ValueError, match="sleep_deviation"):
+        JiwaRelapsePredictor(weights)
+    with pytest.raises(ValueError, match="unknown_feature"):
+        JiwaRelapsePredictor({**JiwaRelapsePredictor.DEFAULT_WEIGHTS, "unknown_feature": 1.0})
+    predictor = JiwaRelapsePredictor()
+    with pytest.raises(TypeError):
+        predictor.weights["sleep_deviation"] = 0.0
+
+
+@needs_numpy
+@pytest.mark.parametrize("dtype", ["float32", "float64"])
+@pytest.mark.parametrize("path", BATCH_PATHS, ids=lambda f: f.__name__.strip("_"))
+def test_batch_paths_match_scalar(path, dtype, monkeypatch):
+    predictor = JiwaRelapsePredictor()
+    snaps = _snapshots(257)
+    risk, features = path(predictor, snaps, dtype, monkeypatch)
+    _assert_matches_scalar(predictor, snaps, risk, features, dtype)
+
+
+@needs_numpy
+@pytest.mark.parametrize("dtype", ["float32", "float64"])
+def test_batch_outcomes_match_scalar(dtype):
+    predictor = JiwaRelapsePredictor()
+    snaps = _snapshots(64)
+    outcomes, comparison = predictor._score_once_batch(snaps, dtype)
+    tol = TOLERANCE[dtype]
+    for i, p in enumerate(snaps):
+        expected_outcome, expected_comparison = predictor.score(p)
+        for key, value in expected_outcome.to_dict().items():
+            if key != "features":
+                assert outcomes[key][i] == pytest.approx(value, abs=tol)
+        for key, value in expected_comparison.items():
+            assert comparison[key][i] == pytest.approx(value, abs=tol)
+
+
+@needs_numpy
+@pytest.mark.parametrize("dtype", ["float32", "float64"])
+def test_raw_matrix_matches_scalar_on_unclamped_rows(dtype):
+    predictor = JiwaRelapsePredictor()
+    rows = _raw_rows(257, seed=4)
+    matrix = jrp.np.array(rows)
+    risk, features = predictor.score_cohort_matrix(matrix, dtype, n_threads=3)
+    snaps = [PatientSnapshot(*row) for row in rows]
+    _assert_matches_scalar(predictor, snaps, risk, features, dtype)
+    # Input mentah tidak ikut ter-clip
+    assert (matrix == jrp.np.array(rows)).all()
+
+
+@needs_numpy
+@pytest.mark.parametrize("value", [math.nan, math.inf, -math.inf])
+def test_raw_matrix_rejects_non_finite(value):
+    matrix = jrp.np.array(_raw_rows(8))
+    matrix[5, SNAPSHOT_FIELDS.index("current_sleep_hours")] = value
+    with pytest.raises(ValueError, match="current_sleep_hours"):
+        JiwaRelapsePredictor().score_cohort_matrix(matrix)
+
+
+@needs_numpy
+@pytest.mark.parametrize("shape", [(4, 17), (18,), (2, 18, 1)])
+def test_raw_matrix_rejects_bad_shape(shape):
+    with pytest.raises(ValueError, match="N, 18"):
+        JiwaRelapsePredictor().score_cohort_matrix(jrp.np.zeros(shape))
+
+
+@needs_numpy
+@pytest.mark.parametrize("dtype", ["float32", "float64"])
+def test_score_cohort_empty(dtype):
+    predictor = JiwaRelapsePredictor()
+    for risk, features in (
+        predictor.score_cohort([], dtype),
+        predictor.score_cohort_matrix(jrp.np.empty((0, len(SNAPSHOT_FIELDS))), dtype),
+    ):
+        assert risk.shape == (0,) and risk.dtype == dtype
+        assert features.shape == (0, len(FEATURE_NAMES)) and features.dtype == dtype
+
+
+@needs_numba
+@pytest.mark.parametrize("n", [1, 3])
+def test_score_cohort_more_threads_than_rows(n):
+    predictor = JiwaRelapsePredictor()
+    snaps = _snapshots(n, seed=5)
+    risk, features = predictor.score_cohort(snaps, "float64", n_threads=16)
+    _assert_matches_scalar(predictor, snaps, risk, features, "float64")